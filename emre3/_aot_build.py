@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""emre3_kernels AOT derlemesi (numba.pycc).
+
+Çalıştır: cd emre3 && python _aot_build.py
+Çıktı emre3/ altında emre3_kernels.*.so olur; restart'ta JIT derlemesi yok.
+"""
+
+import os
+
+from numba.pycc import CC
+
+from _kernels_numba import market_pass
+
+cc = CC("emre3_kernels")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__))
+
+cc.export("market_pass", "UniTuple(f8, 3)(f8[:])")(market_pass)
+
+if __name__ == "__main__":
+    cc.compile()
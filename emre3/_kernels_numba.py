@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Numba-uyumlu sayısal çekirdekler.
+
+Düz Python fonksiyonları; _aot_build.py bunları pycc ile emre3_kernels
+modülüne derler. emre_trader derlenmiş modül yoksa NumPy yoluna düşer.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def market_pass(closes: np.ndarray):
+    """Son 40 bar üzerinde tek döngü: bb_width (20), price_range (30), volatility (20 getiri)"""
+    n = closes.shape[0]
+    start = n - 40 if n > 40 else 0
+
+    rng_max = closes[start]
+    rng_min = closes[start]
+    rng_s = 0.0
+    rng_c = 0
+    bb_s = 0.0
+    vol_s = 0.0
+    vol_c = 0
+    for i in range(start, n):
+        x = closes[i]
+        if i >= n - 30:
+            if rng_c == 0 or x > rng_max:
+                rng_max = x
+            if rng_c == 0 or x < rng_min:
+                rng_min = x
+            rng_s += x
+            rng_c += 1
+        if i >= n - 20:
+            bb_s += x
+            prev = closes[i - 1]
+            if i > 0 and prev > 0:
+                vol_s += abs(x - prev) / prev
+                vol_c += 1
+
+    # Bollinger Band width (populasyon std, ddof=0)
+    middle = bb_s / 20.0
+    var = 0.0
+    for i in range(n - 20, n):
+        d = closes[i] - middle
+        var += d * d
+    std = np.sqrt(var / 20.0)
+    upper = middle + std * 2.0
+    lower = middle - std * 2.0
+    bb_width = (upper - lower) / middle if middle > 0 else 1.0
+
+    price_range = (rng_max - rng_min) / (rng_s / rng_c)
+    recent_vol = vol_s / vol_c if vol_c else 0.001
+
+    return bb_width, price_range, recent_vol
@@ -20,8 +20,9 @@ Stop/targets are calculated by the risk engine.
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Tuple
-import math
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
 
 
 def _safe_float(x: Any, default: float = 0.0) -> float:
@@ -37,6 +38,19 @@ def _closes(mem: Dict[str, Any], tf: str) -> List[float]:
     return [_safe_float(x, 0.0) for x in xs]
 
 
+# 15m tarafında okunan en uzun pencere (_market_pass: 40 bar)
+_LOOKBACK_15M = 40
+
+
+def _closes15_np(mem: Dict[str, Any]) -> np.ndarray:
+    # MarketAdapter.fetch hazır float64 dizisini bırakır; yoksa sadece son pencereyi çevir
+    arr = mem.get("closes_15m_np")
+    if arr is None:
+        xs = ((mem.get("15m", {}) or {}).get("closes", []) or [])[-_LOOKBACK_15M:]
+        arr = np.fromiter((_safe_float(x, 0.0) for x in xs), dtype=np.float64, count=len(xs))
+    return arr
+
+
 def _last_price(mem: Dict[str, Any]) -> float:
     m1 = mem.get("1m", {}) or {}
     if "price" in m1:
@@ -45,7 +59,7 @@ def _last_price(mem: Dict[str, Any]) -> float:
     return closes1[-1] if closes1 else 0.0
 
 
-def _ret(xs: List[float], n: int) -> float:
+def _ret(xs: Sequence[float], n: int) -> float:
     if len(xs) < n + 1:
         return 0.0
     a = xs[-1]
@@ -70,17 +84,16 @@ class Signal:
 
 
 # ===== YENİ: MARKET CONDITION DETECTORS =====
-def _calculate_bollinger_bands(closes: List[float], period: int = 20, std_dev: float = 2.0) -> Tuple[float, float, float, float]:
+def _calculate_bollinger_bands(closes: np.ndarray, period: int = 20, std_dev: float = 2.0) -> Tuple[float, float, float, float]:
     """Bollinger Band hesapla: upper, middle, lower, width (%)"""
     if len(closes) < period:
         return 0.0, 0.0, 0.0, 1.0
     
     recent = closes[-period:]
-    middle = sum(recent) / period
+    middle = float(recent.mean())
     
-    # Standart sapma
-    variance = sum((x - middle) ** 2 for x in recent) / period
-    std = math.sqrt(variance) if variance >= 0 else 0.0
+    # Standart sapma (populasyon, ddof=0)
+    std = float(recent.std())
     
     upper = middle + (std * std_dev)
     lower = middle - (std * std_dev)
@@ -107,25 +120,44 @@ def _is_near_band(price: float, upper: float, lower: float, threshold_pct: float
     return False, ""
 
 
-def _market_condition_score(closes: List[float]) -> Dict[str, Any]:
-    """Piyasa durumu skorlaması: consolidation, trend, volatility"""
-    if len(closes) < 40:
-        return {"consolidation": False, "bb_width": 1.0, "score": 0.0}
+def _market_pass(closes: np.ndarray, std_dev: float = 2.0) -> Tuple[float, float, float]:
+    """Son 40 bar üzerinde tek geçiş: bb_width (20), price_range (30), volatility (20 getiri)"""
+    tail = closes[-40:]
     
     # Bollinger Band width
-    _, _, _, bb_width = _calculate_bollinger_bands(closes, period=20)
+    bb = tail[-20:]
+    middle = float(bb.mean())
+    std = float(bb.std())
+    upper = middle + (std * std_dev)
+    lower = middle - (std * std_dev)
+    bb_width = (upper - lower) / middle if middle > 0 else 1.0
     
     # Price range (son 30 bar)
-    recent = closes[-30:] if len(closes) >= 30 else closes
-    price_range = (max(recent) - min(recent)) / (sum(recent) / len(recent))
+    rng = tail[-30:]
+    price_range = float((rng.max() - rng.min()) / rng.mean())
     
     # Volatility (son 20 barın avg movement)
-    volatilities = []
-    for i in range(1, len(closes)):
-        if closes[i-1] > 0:
-            volatilities.append(abs(closes[i] - closes[i-1]) / closes[i-1])
+    prev = tail[-21:-1]
+    valid = prev > 0
+    rets = np.abs(np.diff(tail[-21:]))[valid] / prev[valid]
+    recent_vol = float(rets.mean()) if rets.size else 0.001
+    
+    return bb_width, price_range, recent_vol
+
+
+try:
+    # AOT derlenmiş çekirdek (python _aot_build.py); yoksa NumPy yolu kalır
+    from emre3_kernels import market_pass as _market_pass
+except ImportError:
+    pass
+
+
+def _market_condition_score(closes: np.ndarray) -> Dict[str, Any]:
+    """Piyasa durumu skorlaması: consolidation, trend, volatility"""
+    if len(closes) < 40:
+        return {"consolidation": False, "bb_width": 1.0, "score": 0.0}
     
-    recent_vol = sum(volatilities[-20:]) / 20 if len(volatilities) >= 20 else 0.001
+    bb_width, price_range, recent_vol = _market_pass(closes)
     
     # Consolidation score (0-1)
     consolidation_score = 0.0
@@ -155,7 +187,7 @@ def _market_condition_score(closes: List[float]) -> Dict[str, Any]:
 
 # ===== ANA SİNYAL FONKSİYONU (GÜNCELLENDİ) =====
 def _bias_from_15m(mem: Dict[str, Any]) -> Tuple[str, str, str, str, Dict[str, Any]]:
-    closes15 = _closes(mem, "15m")
+    closes15 = _closes15_np(mem)
     price = _last_price(mem)
     
     # 1. ÖNCE PİYASA DURUMUNU TESPİT ET
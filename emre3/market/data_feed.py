@@ -1,18 +1,34 @@
 """Simple Data Feed"""
-import random
+import numpy as np
+
+# Önceden doldurulmuş gürültü tamponu: her tick'te RNG çağrısı yerine tek indeks okuma
+_BUF_SIZE = 4096
+_RNG = np.random.default_rng()
+_BUF = _RNG.integers(-1000, 1001, size=_BUF_SIZE).tolist()
+_IDX = 0
+
+
+def _noise() -> int:
+    global _BUF, _IDX
+    x = _BUF[_IDX]
+    _IDX = (_IDX + 1) & (_BUF_SIZE - 1)
+    if _IDX == 0:
+        _BUF = _RNG.integers(-1000, 1001, size=_BUF_SIZE).tolist()
+    return x
+
 
 class DataFeed:
     def __init__(self, config):
         self.config = config
-    
+
     async def initialize(self):
         pass
-    
+
     async def get_latest(self):
-        return {'close': 90000 + random.randint(-1000, 1000)}
-    
+        return {'close': 90000 + _noise()}
+
     def get_current_price(self):
-        return 90000 + random.randint(-1000, 1000)
-    
+        return 90000 + _noise()
+
     async def shutdown(self):
         pass
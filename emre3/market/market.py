@@ -6,6 +6,8 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 import time
 
+import numpy as np
+
 from emre_market import EmreMarket
 
 def _pct_range(xs: List[float]) -> float:
@@ -58,6 +60,7 @@ class MarketAdapter:
             mem["price"] = 0.0
             mem["closes_1m"] = []
             mem["closes_15m"] = []
+            mem["closes_15m_np"] = np.empty(0, dtype=np.float64)
             mem["range15"] = 0.0
             mem["range60"] = 0.0
             mem["vol_1m"] = 0.0
@@ -66,6 +69,9 @@ class MarketAdapter:
 
         closes1 = list(raw.get("1m", {}).get("closes") or [])
         closes15 = list(raw.get("15m", {}).get("closes") or [])
+        # float64 view built once per fetch; emre_trader reads it instead of re-coercing lists
+        closes15_np = np.fromiter((float(x) for x in closes15), dtype=np.float64, count=len(closes15))
+        raw["closes_15m_np"] = closes15_np
 
         price = float(raw.get("1m", {}).get("price") or (closes1[-1] if closes1 else 0.0))
 
@@ -73,6 +79,7 @@ class MarketAdapter:
         mem["price"] = price
         mem["closes_1m"] = closes1
         mem["closes_15m"] = closes15
+        mem["closes_15m_np"] = closes15_np
 
         # ranges
         mem["range15"] = _pct_range(closes1[-15:]) if len(closes1) >= 15 else _pct_range(closes1)
@@ -1,7 +1,69 @@
 """Telegram Notifier"""
+import asyncio
+
+import aiohttp
+
+
 class TelegramNotifier:
+    # Kuyruk dolarsa en eski mesaj düşer; trading döngüsü gönderimi asla beklemez.
+    QUEUE_MAX = 100
+
     def __init__(self, config):
         self.config = config
-    async def initialize(self): pass
-    async def send_message(self, message): print(f"[TG] {message}")
-    async def shutdown(self): pass
+        self._session = None
+        self._queue = None
+        self._worker = None
+        self._url = ""
+        self._chat_id = ""
+
+    async def initialize(self):
+        token = await self.config.get("TELEGRAM_BOT_TOKEN", "")
+        self._chat_id = await self.config.get("TELEGRAM_CHAT_ID", "")
+        if not token or not self._chat_id:
+            print("[TG] Token veya chat_id yok, mesajlar sadece loglanacak")
+            return
+        self._url = f"https://api.telegram.org/bot{token}/sendMessage"
+        self._session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+        self._queue = asyncio.Queue(maxsize=self.QUEUE_MAX)
+        self._worker = asyncio.create_task(self._drain())
+
+    async def send_message(self, message):
+        if self._queue is None:
+            print(f"[TG] {message}")
+            return
+        if self._queue.full():
+            self._queue.get_nowait()
+            self._queue.task_done()
+        self._queue.put_nowait(message)
+
+    async def _drain(self):
+        while True:
+            message = await self._queue.get()
+            try:
+                await self._post(message)
+            except Exception as e:
+                # tek bozuk gönderim worker'ı öldürmesin (yoksa kuyruk bir daha boşalmaz)
+                print(f"[TG] beklenmeyen gönderim hatası: {type(e).__name__}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _post(self, message):
+        data = {"chat_id": self._chat_id, "text": message, "parse_mode": "HTML"}
+        try:
+            async with self._session.post(self._url, json=data) as r:
+                if r.status != 200:
+                    print(f"[TG] Telegram hatası {r.status}")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[TG] gönderim hatası: {e}")
+
+    async def shutdown(self):
+        if self._worker:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=10)
+            except asyncio.TimeoutError:
+                pass
+            self._worker.cancel()
+            self._worker = None
+        if self._session:
+            await self._session.close()
+            self._session = None
@@ -0,0 +1,170 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+# -*- coding: utf-8 -*-
+"""Cython port of RiskEngine's stop/TP hot path.
+
+risk/engine.py ile birebir aynı mantık; derlenmiş modül yoksa engine.py
+saf Python yoluna düşer. Build: python setup.py build_ext --inplace
+"""
+
+cdef double _f(object x, double d):
+    try:
+        return float(x)
+    except Exception:
+        return d
+
+
+cdef list _as_list(object xs):
+    if xs is None:
+        return []
+    if type(xs) is list:
+        return <list>xs
+    return list(xs)
+
+
+cdef Py_ssize_t _start(Py_ssize_t n, Py_ssize_t lookback):
+    # closes[-lookback:] if len(closes) >= lookback else closes
+    if lookback <= 0 or n <= lookback:
+        return 0
+    return n - lookback
+
+
+cdef double _wmin(list xs, Py_ssize_t lookback):
+    cdef Py_ssize_t n = len(xs)
+    cdef Py_ssize_t i = _start(n, lookback)
+    cdef double lo = xs[i]
+    cdef double v
+    for i in range(i + 1, n):
+        v = xs[i]
+        if v < lo:
+            lo = v
+    return lo
+
+
+cdef double _wmax(list xs, Py_ssize_t lookback):
+    cdef Py_ssize_t n = len(xs)
+    cdef Py_ssize_t i = _start(n, lookback)
+    cdef double hi = xs[i]
+    cdef double v
+    for i in range(i + 1, n):
+        v = xs[i]
+        if v > hi:
+            hi = v
+    return hi
+
+
+cdef class RiskEngineC:
+    cdef double k_vol_stop
+    cdef double min_stop_bp
+    cdef double struct_buffer_bp
+    cdef double tp2_impulse_mult
+    cdef double tp2_impulse_mult_highvol
+    cdef double highvol_threshold
+    cdef double tp3_trend_mult
+    cdef double tp4_trend_mult
+    cdef double m3
+    cdef double m4
+    cdef Py_ssize_t struct_lookback_1m
+    cdef Py_ssize_t impulse_lookback_1m
+
+    def __init__(self, cfg):
+        self.k_vol_stop = cfg.K_VOL_STOP
+        self.min_stop_bp = cfg.MIN_STOP_BP
+        self.struct_buffer_bp = cfg.STRUCT_BUFFER_BP
+        self.tp2_impulse_mult = cfg.TP2_IMPULSE_MULT
+        self.tp2_impulse_mult_highvol = cfg.TP2_IMPULSE_MULT_HIGHVOL
+        self.highvol_threshold = cfg.HIGHVOL_THRESHOLD
+        self.tp3_trend_mult = cfg.TP3_TREND_MULT
+        self.tp4_trend_mult = cfg.TP4_TREND_MULT
+        self.m3 = cfg.M3
+        self.m4 = cfg.M4
+        self.struct_lookback_1m = cfg.STRUCT_LOOKBACK_1M
+        self.impulse_lookback_1m = cfg.IMPULSE_LOOKBACK_1M
+
+    # ---------------- STOP ----------------
+
+    cpdef double calc_stop_phase0(self, dict mem, str side, double entry):
+        cdef list closes = _as_list(mem.get("closes_1m") or [])
+        cdef double vol_1m = _f(mem.get("vol_1m"), 0.0)
+        cdef double range15 = _f(mem.get("range15"), 0.0)
+        cdef double range60 = _f(mem.get("range60"), 0.0)
+        cdef bint is_long = side == "LONG"
+        cdef double dist, dist_range, extreme, pad, stop_vol, stop_struct
+
+        dist = entry * self.k_vol_stop * vol_1m
+        if entry * self.min_stop_bp > dist:
+            dist = entry * self.min_stop_bp
+        dist_range = entry * (range15 if range15 > range60 else range60) * 0.5
+        if dist_range > dist:
+            dist = dist_range
+
+        stop_vol = (entry - dist) if is_long else (entry + dist)
+
+        if closes:
+            extreme = _wmin(closes, self.struct_lookback_1m) if is_long else _wmax(closes, self.struct_lookback_1m)
+        else:
+            extreme = 0.0
+        pad = entry * self.struct_buffer_bp
+        if extreme == 0.0:
+            stop_struct = stop_vol
+        else:
+            stop_struct = (extreme - pad) if is_long else (extreme + pad)
+
+        if (mem.get("entry_mode") or "").upper() == "EARLY":
+            stop_vol = (entry - dist * 1.4) if is_long else (entry + dist * 1.4)
+
+        if is_long:
+            return stop_struct if stop_struct < stop_vol else stop_vol
+        return stop_struct if stop_struct > stop_vol else stop_vol
+
+    cpdef double calc_stop_phase1plus(self, dict mem, str side, double entry, double current_stop):
+        cdef list closes = _as_list(mem.get("closes_1m") or [])
+        if not closes:
+            return current_stop
+        cdef double pad = entry * self.struct_buffer_bp
+        if side == "LONG":
+            return _wmin(closes, self.impulse_lookback_1m) - pad
+        return _wmax(closes, self.impulse_lookback_1m) + pad
+
+    # ---------------- TPS ----------------
+
+    cpdef tuple calc_tps(self, dict mem, str side, double entry, double stop, object current=None):
+        cdef list closes = _as_list(mem.get("closes_1m") or [])
+        cdef double vol_1m = _f(mem.get("vol_1m"), 0.0)
+        cdef bint is_long = side == "LONG"
+        cdef double imp, mult, tp2, tp3, tp4, anchor, r
+
+        if closes:
+            imp = _wmax(closes, self.impulse_lookback_1m) - _wmin(closes, self.impulse_lookback_1m)
+        else:
+            imp = 0.0
+        if imp <= 0:
+            imp = abs(entry - stop)
+
+        mult = self.tp2_impulse_mult_highvol if vol_1m > self.highvol_threshold else self.tp2_impulse_mult
+        tp2 = (entry + imp * mult) if is_long else (entry - imp * mult)
+
+        if (mem.get("regime") or "RANGE").upper() == "TREND":
+            if closes:
+                anchor = _wmax(closes, 60) if is_long else _wmin(closes, 60)
+            else:
+                anchor = 0.0
+            if anchor == 0.0:
+                anchor = entry
+            if is_long:
+                tp3 = anchor + imp * self.tp3_trend_mult
+                tp4 = anchor + imp * self.tp4_trend_mult
+            else:
+                tp3 = anchor - imp * self.tp3_trend_mult
+                tp4 = anchor - imp * self.tp4_trend_mult
+            return tp2, tp3, tp4
+
+        r = abs(entry - stop)
+        if entry * self.min_stop_bp > r:
+            r = entry * self.min_stop_bp
+        if is_long:
+            tp3 = entry + self.m3 * r
+            tp4 = entry + self.m4 * r
+        else:
+            tp3 = entry - self.m3 * r
+            tp4 = entry - self.m4 * r
+        return tp2, tp3, tp4
@@ -9,6 +9,12 @@ import hashlib
 from .models import RiskSet
 from .config import RiskConfig
 
+try:
+    # derlenmiş stop/TP çekirdeği (risk/_engine.pyx); yoksa saf Python yolu
+    from ._engine import RiskEngineC
+except ImportError:
+    RiskEngineC = None
+
 
 def _id_from(ts: int, side: str, entry: float) -> str:
     h = hashlib.sha1(f"{ts}:{side}:{entry}".encode("utf-8")).hexdigest()[:10]
@@ -52,6 +58,12 @@ def _trend_anchor(closes_1m: List[float], side: str, lookback: int = 60) -> floa
 class RiskEngine:
     def __init__(self, cfg: RiskConfig | None = None):
         self.cfg = cfg or RiskConfig()
+        if RiskEngineC is not None:
+            # instance attribute'ları Python metodlarını gölgeler; çağrı yerleri değişmez
+            kernel = RiskEngineC(self.cfg)
+            self._calc_stop_phase0 = kernel.calc_stop_phase0
+            self._calc_stop_phase1plus = kernel.calc_stop_phase1plus
+            self._calc_tps = kernel.calc_tps
 
     def open(self, mem: Dict[str, Any], side: str, entry: float, ts: int) -> RiskSet:
         stop = self._calc_stop_phase0(mem, side, entry)
@@ -100,38 +112,34 @@ class RiskEngine:
         vol_1m = _safe_float(mem.get("vol_1m"), 0.0)
         range15 = _safe_float(mem.get("range15"), 0.0)
         range60 = _safe_float(mem.get("range60"), 0.0)
+        cfg = self.cfg
+        sgn = 1.0 if side == "LONG" else -1.0
 
         # --- base distances ---
-        dist_vol = entry * self.cfg.K_VOL_STOP * vol_1m
-        dist_min = entry * self.cfg.MIN_STOP_BP
+        dist_vol = entry * cfg.K_VOL_STOP * vol_1m
+        dist_min = entry * cfg.MIN_STOP_BP
 
         # Range tabanı: choppy piyasalarda stop'u "katil" olmaktan çıkarır.
         dist_range = entry * max(range15, range60) * 0.5
 
         dist = max(dist_vol, dist_min, dist_range)
-        stop_vol = (entry - dist) if side == "LONG" else (entry + dist)
+        stop_vol = entry - sgn * dist
 
         # Structure extreme tabanı (genişletici): son yapı ekstremine pay bırak
-        extreme = _structure_extreme(closes, side=side, lookback=self.cfg.STRUCT_LOOKBACK_1M)
-        pad = entry * self.cfg.STRUCT_BUFFER_BP
+        extreme = _structure_extreme(closes, side=side, lookback=cfg.STRUCT_LOOKBACK_1M)
+        pad = entry * cfg.STRUCT_BUFFER_BP
         if extreme == 0.0:
             stop_struct = stop_vol
         else:
-            stop_struct = (extreme - pad) if side == "LONG" else (extreme + pad)
+            stop_struct = extreme - sgn * pad
 
         # EARLY girişte stop'u daha "sigorta" yap (geniş)
         entry_mode = (mem.get("entry_mode") or "").upper()
         if entry_mode == "EARLY":
-            if side == "LONG":
-                stop_vol = entry - dist * 1.4
-            else:
-                stop_vol = entry + dist * 1.4
-
-        # Daha geniş (daha fazla alan) stop seç
-        if side == "LONG":
-            stop = min(stop_struct, stop_vol)
-        else:
-            stop = max(stop_struct, stop_vol)
+            stop_vol = entry - sgn * dist * 1.4
+
+        # Daha geniş (daha fazla alan) stop seç: LONG'da min, SHORT'ta max
+        stop = sgn * min(sgn * stop_struct, sgn * stop_vol)
 
         return float(stop)
 
@@ -144,7 +152,8 @@ class RiskEngine:
         extreme = _structure_extreme(closes, side=side, lookback=self.cfg.IMPULSE_LOOKBACK_1M)
         pad = entry * self.cfg.STRUCT_BUFFER_BP
 
-        proposed = (extreme - pad) if side == "LONG" else (extreme + pad)
+        sgn = 1.0 if side == "LONG" else -1.0
+        proposed = extreme - sgn * pad
         return float(proposed)
 
     # ---------------- TPS ----------------
@@ -160,6 +169,7 @@ class RiskEngine:
         closes = list(mem.get("closes_1m") or [])
         regime = (mem.get("regime") or "RANGE").upper()
         vol_1m = _safe_float(mem.get("vol_1m"), 0.0)
+        sgn = 1.0 if side == "LONG" else -1.0
 
         # TP2: impulse length (executable)
         imp = _impulse_len(closes, lookback=self.cfg.IMPULSE_LOOKBACK_1M)
@@ -168,10 +178,7 @@ class RiskEngine:
             imp = abs(entry - stop)
 
         mult = self.cfg.TP2_IMPULSE_MULT_HIGHVOL if vol_1m > self.cfg.HIGHVOL_THRESHOLD else self.cfg.TP2_IMPULSE_MULT
-        if side == "LONG":
-            tp2 = float(entry + imp * mult)
-        else:
-            tp2 = float(entry - imp * mult)
+        tp2 = float(entry + sgn * imp * mult)
 
         # TP3/TP4: trend projection in TREND, else R-multiple fallback
         if regime == "TREND":
@@ -179,12 +186,8 @@ class RiskEngine:
             if anchor == 0.0:
                 anchor = entry
 
-            if side == "LONG":
-                tp3 = float(anchor + imp * self.cfg.TP3_TREND_MULT)
-                tp4 = float(anchor + imp * self.cfg.TP4_TREND_MULT)
-            else:
-                tp3 = float(anchor - imp * self.cfg.TP3_TREND_MULT)
-                tp4 = float(anchor - imp * self.cfg.TP4_TREND_MULT)
+            tp3 = float(anchor + sgn * imp * self.cfg.TP3_TREND_MULT)
+            tp4 = float(anchor + sgn * imp * self.cfg.TP4_TREND_MULT)
 
             # TREND’de TP3/TP4 aşağı “hızlı” revize olmasın:
             # current varsa ve yeni değer "trend yönüne aykırı" ise core drift guard ile de tutacağız
@@ -193,12 +196,8 @@ class RiskEngine:
         # RANGE: classic R-multiple
         r = abs(entry - stop)
         r = max(r, entry * self.cfg.MIN_STOP_BP)
-        if side == "LONG":
-            tp3 = float(entry + self.cfg.M3 * r)
-            tp4 = float(entry + self.cfg.M4 * r)
-        else:
-            tp3 = float(entry - self.cfg.M3 * r)
-            tp4 = float(entry - self.cfg.M4 * r)
+        tp3 = float(entry + sgn * self.cfg.M3 * r)
+        tp4 = float(entry + sgn * self.cfg.M4 * r)
 
         return tp2, tp3, tp4
 
@@ -1,13 +1,12 @@
 from __future__ import annotations
-from dataclasses import dataclass, field
-from typing import Any, Dict
+from typing import Any, Dict, NamedTuple
 
-@dataclass(frozen=True)
-class RiskSet:
+class RiskSet(NamedTuple):
+    # immutable; tuple.__new__ ile kurulur (frozen dataclass'ın alan başına object.__setattr__ maliyeti yok)
     id: str
     created_ts: int
     stop: float
     tp2: float
     tp3: float
     tp4: float
-    meta: Dict[str, Any] = field(default_factory=dict)
+    meta: Dict[str, Any]
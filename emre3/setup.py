@@ -0,0 +1,10 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Opsiyonel C eklentileri. Build: python setup.py build_ext --inplace"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="emre3-ext",
+    ext_modules=cythonize(["risk/_engine.pyx"], language_level=3),
+)
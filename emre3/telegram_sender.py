@@ -1,13 +1,30 @@
 #!/usr/bin/env python3
 import os
 import requests
-import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
 BOT_NAME = os.getenv("EMRE3_NAME", "EMRE3")
 
-def send_message(text: str, max_retries: int = 3):
+# Tek kalıcı session: api.telegram.org TLS bağlantısı mesajlar arasında sıcak kalır.
+# Yeniden deneme adapter içinde yapılır (toplam 3 deneme), böylece retry'lar da aynı soketi kullanır.
+_RETRY = Retry(
+    total=2,
+    backoff_factor=1,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({"POST"}),
+    raise_on_status=False,
+    # 429 Retry-After onlarca saniye olabilir; send trading döngüsünden senkron çağrılır,
+    # o yüzden yalnız backoff uygulanır (retry'lar arası toplam ~2 sn)
+    respect_retry_after_header=False,
+)
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=4, max_retries=_RETRY))
+
+
+def send_message(text: str):
     """Telegram'a mesaj gönder"""
     if not TOKEN or not CHAT_ID:
         print(f"[{BOT_NAME}] Telegram token/chat_id eksik")
@@ -15,25 +32,21 @@ def send_message(text: str, max_retries: int = 3):
     
     message = f"🔧 [{BOT_NAME}] {text}"
     
-    for attempt in range(max_retries):
-        try:
-            url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
-            data = {
-                "chat_id": CHAT_ID,
-                "text": message,
-                "parse_mode": "HTML"
-            }
-            response = requests.post(url, json=data, timeout=10)
-            
-            if response.status_code == 200:
-                return True
-            else:
-                print(f"[{BOT_NAME}] Telegram hatası {response.status_code}")
-                time.sleep(1)
-                
-        except Exception as e:
-            print(f"[{BOT_NAME}] Telegram exception: {e}")
-            time.sleep(1)
+    try:
+        url = f"https://api.telegram.org/bot{TOKEN}/sendMessage"
+        data = {
+            "chat_id": CHAT_ID,
+            "text": message,
+            "parse_mode": "HTML"
+        }
+        response = _SESSION.post(url, json=data, timeout=10)
+        
+        if response.status_code == 200:
+            return True
+        print(f"[{BOT_NAME}] Telegram hatası {response.status_code}")
+        
+    except requests.RequestException as e:
+        print(f"[{BOT_NAME}] Telegram exception: {e}")
     
     return False
 
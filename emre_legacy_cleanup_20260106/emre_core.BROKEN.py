@@ -24,34 +24,185 @@ Bu dosya, tar.gz içindeki “çalışan” core taban alınarak düzenlendi:
 
 from __future__ import annotations
 
+import hashlib
 import json
+import math
 import os
+import struct
 import time
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import requests
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack  # type: ignore
+except ImportError:
+    msgpack = None
+
+# Sıcak yoldaki bağımlılıklar modül yüklenirken bir kez çözülür (her çağrıda import yok).
+# ImportError: core, trader/telegram olmadan da import edilebilsin (araçlar, kuru çalıştırma).
+try:
+    from telegram_sender import send_message as _tg_send
+except ImportError:
+    _tg_send = None
+
+try:
+    from emre_trader import decide as _decide
+except ImportError:
+    _decide = None
 
 UTC3 = timezone(timedelta(hours=3))
 
+_TG_SEP = "\n---\n"
+_TG_MAX_LEN = 4096
+
+# Mesaj şablonları (modül yüklenirken bir kez kurulur; _fmt_* yalnız .format çağırır)
+_GH_LINE_TMPL = "• GH: <b>{:.2f}</b>{}\n"
+_OPEN_TMPL = (
+    "🚨 <b>EMRE OPEN</b>\n"
+    "• {} | <b>{}</b>\n"
+    "• entry: <b>{:.2f}</b>\n"
+    "• stop: <b>{:.2f}</b>\n"
+    "{}"
+    "• TP1: <b>{:.2f}</b>\n"
+    "• TP2: {:.2f}  TP3: {:.2f}  TP4: {:.2f}\n"
+    "• struct: {}  trap={}  bias={}\n"
+    "• time: {}\n"
+)
+_UPDATE_TMPL = (
+    "🔁 <b>EMRE UPDATE</b>\n"
+    "• {} | <b>{}</b>\n"
+    "• price: <b>{:.2f}</b> | entry: {:.2f}\n"
+    "• stop: <b>{:.2f}</b>\n"
+    "{}"
+    "• TP1: <b>{:.2f}</b> {}\n"
+    "• struct: {}  trap={}  bias={}\n"
+    "• time: {}\n"
+)
+_GH_SEEN_TMPL = (
+    "🎯 <b>GH GORULDU</b>\n"
+    "• {} | <b>{}</b>\n"
+    "• price: <b>{:.2f}</b>  GH: <b>{:.2f}</b>\n"
+    "• time: {}\n"
+)
+_EXIT_TMPL = (
+    "🧯 <b>EMRE EXIT</b>\n"
+    "• reason: {}\n"
+    "• time: {}\n"
+)
+_NO_TRADE_TMPL = (
+    "🟨 <b>EMRE NO-TRADE</b>\n"
+    "• {} | {}\n"
+    "• price: {:.2f}\n"
+    "• time: {}\n"
+)
+_STATUS_TMPL = (
+    "🛰 <b>EMRE STATUS</b>\n"
+    "• {}\n"
+    "• is_open: {} side={}\n"
+    "• price: {:.2f}\n"
+    "• time: {}\n"
+)
+
+
+def _json_dumps(obj) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def _json_loads(buf: bytes):
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf.decode("utf-8"))
+
+
+def _is_msgpack_map(buf: bytes) -> bool:
+    # fixmap 0x80-0x8f, map16 0xde, map32 0xdf; JSON state '{' (0x7b) ile başlar
+    if not buf:
+        return False
+    b0 = buf[0]
+    return 0x80 <= b0 <= 0x8F or b0 == 0xDE or b0 == 0xDF
+
+
+def _state_loads(buf: bytes):
+    # format içerikten seçilir: .json -> .msgpack geçişinde iki dosya türü de okunur
+    if _is_msgpack_map(buf):
+        if msgpack is None:
+            raise ValueError("msgpack state, msgpack kurulu değil")
+        return msgpack.unpackb(buf, raw=False)
+    return _json_loads(buf)
+
+
+def _state_dumps(obj, path: str) -> bytes:
+    # .msgpack uzantılı yol -> binary; diğerleri (eski kurulumlar) JSON kalır
+    if msgpack is not None and path.endswith(".msgpack"):
+        return msgpack.packb(obj, use_bin_type=True)
+    return _json_dumps(obj)
+
+
+# saniye çözünürlüğünde cache: aynı tick'te birden fazla formatter datetime+strftime tekrarlamaz
+_NOW_CACHE = [0, ""]
+
 
 def _now_str() -> str:
-    return datetime.now(UTC3).strftime("%H:%M:%S")
+    t = int(time.time())
+    if t != _NOW_CACHE[0]:
+        _NOW_CACHE[0] = t
+        _NOW_CACHE[1] = datetime.fromtimestamp(t, UTC3).strftime("%H:%M:%S")
+    return _NOW_CACHE[1]
 
 
 def _safe_float(x, default: float = 0.0) -> float:
+    # fast path: değerlerin çoğu zaten float; exception makinesine girmeden dön
+    # (int dahil geri kalan her şey try içinde: çok büyük int OverflowError verir)
+    if type(x) is float:
+        return x
     try:
         return float(x)
-    except Exception:
+    except (TypeError, ValueError, OverflowError):
         return float(default)
 
 
 def _clamp_int(x, default: int = 0) -> int:
     try:
         return int(x)
-    except Exception:
+    except (TypeError, ValueError, OverflowError):
         return int(default)
 
 
+def _wall_to_mono(ts: float, wall_now: float, mono_now: float) -> float:
+    """state'teki wall-clock zaman damgasını bu sürecin monotonic eksenine taşı (0 -> hiç olmadı)"""
+    if not ts:
+        return float("-inf")
+    return mono_now - (wall_now - ts)
+
+
+def _cents(x: float) -> int:
+    """fiyat -> tam sayı cent (fingerprint'ler için; float format parser'ı yok)"""
+    # feed'den NaN/inf gelebilir: round() ValueError/OverflowError verir, tick düşmesin
+    return int(round(x * 100)) if math.isfinite(x) else 0
+
+
+_SIDE_CODE = {"LONG": 1, "SHORT": 2}
+# fingerprint türleri (aynı sayılar farklı mesaj türünde çakışmasın)
+_FP_OPEN, _FP_UPD, _FP_NT = 1, 2, 3
+
+
+def _fp64(parts: Tuple[int, ...], extra: bytes = b"") -> int:
+    """tam sayı alanlar -> signed 64-bit fingerprint (int == ile karşılaştırılır).
+    7 fiyat alanı 64 bite kayıpsız sığmaz; 8 byte blake2b dedupe için yeterli."""
+    raw = struct.pack(f"<{len(parts)}q", *parts) + extra
+    return int.from_bytes(hashlib.blake2b(raw, digest_size=8).digest(), "little", signed=True)
+
+
 def _bp(a: float, b: float) -> float:
     """basis points difference a->b (absolute)"""
     if not a:
@@ -59,7 +210,7 @@ def _bp(a: float, b: float) -> float:
     return abs((b - a) / a) * 10000.0
 
 
-@dataclass
+@dataclass(slots=True)
 class _FallbackState:
     is_open: bool = False
     side: str = "NA"            # LONG / SHORT
@@ -79,17 +230,40 @@ class _FallbackState:
     opened_ts: float = 0.0
     last_update_ts: float = 0.0
     tp1_hit: bool = False
+    # run() yazar; slots=True ile tanımsız attribute atanamaz
+    last_price: float = 0.0
 
     # spam control helpers
-    last_sent_fp: str = ""
+    last_sent_fp: int = 0
+    # NO-TRADE dedupe (restart sonrası aynı mesaj tekrar gitmesin)
+    last_nt_fp: int = 0
+    last_nt_ts: float = 0.0
     last_state_key: str = ""
 
 
+_FALLBACK_FIELDS = tuple(f.name for f in fields(_FallbackState))
+_FALLBACK_FIELD_SET = frozenset(_FALLBACK_FIELDS)
+# getattr(..., _MISSING): hasattr'ın try/except'i olmadan alan yokluğu testi
+_MISSING = object()
+# from __future__ annotations -> f.type string
+_FLOAT_FIELDS = frozenset(f.name for f in fields(_FallbackState) if f.type == "float")
+_INT_FIELDS = frozenset(f.name for f in fields(_FallbackState) if f.type == "int")
+
+
 class EmreCore:
+    # Sabit kadanslar (bkz. run() notu)
+    FLAT_EVERY_SEC = 3600
+    UPDATE_EVERY_SEC = 900      # 15dk update (pozisyon açıkken)
+    GH_WINDOW_SEC = 900         # 15dk içinde GH görülmezse pozisyonu kapat (silent)
+    GH_FACTOR = 0.35            # GH = entry ± GH_FACTOR * |entry-stop|
+    # Market poll (update_memory + decide) aralığı: pozisyon açıkken loop_sleep,
+    # pozisyon yokken en az bu kadar (borsayı boşuna yorma)
+    MARKET_POLL_SEC_FLAT = 60
+
     def __init__(
         self,
         symbol: str = "BTCUSDT",
-        loop_sleep: int = 10,
+        loop_sleep: int = 10,                    # poll aralığı (pozisyon açık); flat: max(loop_sleep, MARKET_POLL_SEC_FLAT)
 
         # UPDATE throttles (kept for compatibility; loop enforces fixed cadence)
         update_interval_sec: int = 600,
@@ -105,8 +279,8 @@ class EmreCore:
         status_interval_sec: int = 0,            # 0 => kapalı
         debug_log: bool = True,
 
-        state_path: str = "/opt/emre/emre_state.json",
-    ):
+        state_path: str = "/opt/emre/emre_state.msgpack",
+    ) -> None:
         self.symbol = symbol
         self.loop_sleep = int(loop_sleep)
 
@@ -121,28 +295,64 @@ class EmreCore:
         self.status_interval_sec = int(status_interval_sec)
         self.debug_log = bool(debug_log)
 
-        self.state_path = state_path
-
-        self._market = None
-        self._last_telegram_ts = 0.0
-        self._last_no_trade_ts = 0.0
-        self._last_status_ts = 0.0
-
-        # Load state
-        self.state = self._load_state()
+        self.state_path: str = state_path
+
+        self._market: Optional[Any] = None
+        # tick'ler arasında yeniden kullanılan market belleği (update_memory clear() + doldurur)
+        self._mem: Dict[str, Any] = {}
+        # Süre karşılaştırmaları time.monotonic() ile (NTP/date adımlarından etkilenmez).
+        # State'e yalnız wall-clock yazılır; monotonic karşılıkları aşağıda türetilir.
+        self._last_telegram_ts: float = 0.0
+        # tick içinde biriken mesajlar; tick sonunda tek POST (bkz. _flush_tg)
+        self._tg_buf: List[str] = []
+        # -inf: ilk STATUS ilk tick'te (host uptime'ına bağlı değil)
+        self._last_status_ts: float = float("-inf")
+
+        # Load state (_FallbackState ya da emre_state nesnesi -> Any)
+        self.state: Any = self._load_state()
+        # state değişti mi? (run() tick sonunda en fazla 1 kez diske yazar)
+        self._dirty: bool = False
+        # son yazılan state baytlarının hash'i (süreç içi; aynı içerik tekrar yazılmaz)
+        self._last_saved_digest: int = 0
+        self._rebase_mono()
 
     # -----------------------------
     # Dependencies
     # -----------------------------
-    def _get_market(self):
+    def _get_market(self) -> Any:
+        # EmreMarket lazy kalır: kurulumu ağ istemcisi açar
         if self._market is None:
             from emre_market import EmreMarket
             self._market = EmreMarket(symbol=self.symbol)
         return self._market
 
-    def _send(self, text: str):
-        from telegram_sender import send_message
-        send_message(text)
+    def _send(self, text: str) -> None:
+        if _tg_send is None:
+            return
+        try:
+            _tg_send(text)
+        except requests.RequestException:
+            pass
+
+    def _queue(self, text: str) -> None:
+        self._tg_buf.append(text)
+
+    def _flush_tg(self) -> None:
+        # EXIT->OPEN gibi aynı tick'teki mesajlar tek istekte gider.
+        # Telegram limiti 4096 karakter: sığmayan mesaj yeni parçaya geçer.
+        buf = self._tg_buf
+        if not buf:
+            return
+        chunk = buf[0]
+        for text in buf[1:]:
+            if len(chunk) + len(_TG_SEP) + len(text) > _TG_MAX_LEN:
+                self._send(chunk)
+                chunk = text
+            else:
+                chunk = chunk + _TG_SEP + text
+        self._send(chunk)
+        buf.clear()
+        self._last_telegram_ts = time.monotonic()
 
     # -----------------------------
     # State load/save (prefers emre_state.py)
@@ -151,287 +361,341 @@ class EmreCore:
         # Prefer project state engine if present
         try:
             import emre_state  # type: ignore
-            # If emre_state has a loader, use it; else fall back to json
-            if hasattr(emre_state, "load_state"):
-                return emre_state.load_state(self.state_path)
-            if hasattr(emre_state, "EmreState"):
-                st = emre_state.EmreState(self.state_path)
-                # Some implementations need explicit load()
-                if hasattr(st, "load"):
-                    st.load()
-                return st
-        except Exception:
-            pass
+        except ImportError:
+            emre_state = None
+        # If emre_state has a loader, use it; else fall back to json
+        if emre_state is not None:
+            try:
+                if hasattr(emre_state, "load_state"):
+                    return self._normalize_state(emre_state.load_state(self.state_path))
+                if hasattr(emre_state, "EmreState"):
+                    st = emre_state.EmreState(self.state_path)
+                    # Some implementations need explicit load()
+                    if hasattr(st, "load"):
+                        st.load()
+                    return self._normalize_state(st)
+            except (OSError, ValueError, TypeError, AttributeError):
+                pass
 
-        # Fallback: JSON to dataclass
+        # Fallback: state dosyası (msgpack/JSON) -> dataclass
         st = _FallbackState()
-        if os.path.exists(self.state_path):
+        path = self.state_path
+        if not os.path.exists(path):
+            # yeni .msgpack yolu henüz yoksa eski JSON state'ten devral (ilk save .msgpack yazar)
+            legacy = os.path.splitext(path)[0] + ".json"
+            if path.endswith(".msgpack") and os.path.exists(legacy):
+                path = legacy
+        if os.path.exists(path):
             try:
-                with open(self.state_path, "r", encoding="utf-8") as f:
-                    data = json.load(f) or {}
+                with open(path, "rb") as f:
+                    data = _state_loads(f.read()) or {}
                 for k, v in data.items():
-                    if hasattr(st, k):
+                    if k in _FALLBACK_FIELD_SET:
                         setattr(st, k, v)
-            except Exception:
+            except (OSError, ValueError, AttributeError):
+                # okunamayan / bozuk içerik / dict olmayan içerik -> varsayılan state
+                pass
+        return self._normalize_state(st)
+
+    @staticmethod
+    def _normalize_state(st):
+        # Dış state / eski JSON eksik alan ya da str/None sayı bırakabilir: yüklemede
+        # bir kez varsayılanları doldur ve float alanları float'a çevir ki run()
+        # her tick getattr(..., default) / _safe_float yerine düz attribute okuyabilsin.
+        defaults = _FallbackState()
+        for k in _FALLBACK_FIELDS:
+            try:
+                v = getattr(st, k, _MISSING)
+                if v is _MISSING:
+                    setattr(st, k, getattr(defaults, k))
+                elif k in _FLOAT_FIELDS:
+                    setattr(st, k, _safe_float(v, 0.0))
+                elif k in _INT_FIELDS and type(v) is not int:
+                    # eski state: string fingerprint -> 0 (bir sonraki mesajda yeniden kurulur)
+                    setattr(st, k, _clamp_int(v, 0))
+            except (AttributeError, TypeError):
                 pass
         return st
 
-    def _save_state(self):
+    def _rebase_mono(self) -> None:
+        # restart: kalıcı wall-clock damgalarından monotonic eşlerini kur
+        s = self.state
+        wall_now = time.time()
+        mono_now = time.monotonic()
+        self._opened_mono: float = _wall_to_mono(s.opened_ts, wall_now, mono_now)
+        self._last_update_mono: float = _wall_to_mono(s.last_update_ts, wall_now, mono_now)
+        self._last_nt_mono: float = _wall_to_mono(s.last_nt_ts, wall_now, mono_now)
+
+    def _mark_dirty(self) -> None:
+        self._dirty = True
+
+    def _flush_state(self) -> None:
+        if self._dirty:
+            self._dirty = not self._save_state_now()
+
+    def _save_state_now(self) -> bool:
         # If external state has save, use it
         try:
             if hasattr(self.state, "save"):
                 self.state.save()
-                return
-        except Exception:
+                return True
+        except (OSError, ValueError, TypeError):
             pass
 
-        # Fallback: JSON dump
+        # Fallback: msgpack/JSON dump (tmp + rename: yarım yazılmış state dosyası kalmaz)
         try:
-            with open(self.state_path, "w", encoding="utf-8") as f:
-                if isinstance(self.state, _FallbackState):
-                    json.dump(asdict(self.state), f, indent=2, ensure_ascii=False)
-                else:
-                    # best-effort: dump known attrs
-                    out = {}
-                    for k in asdict(_FallbackState()).keys():
-                        if hasattr(self.state, k):
-                            out[k] = getattr(self.state, k)
-                    json.dump(out, f, indent=2, ensure_ascii=False)
-        except Exception:
-            pass
+            # bilinen alanlar (dataclass için asdict'in deep-copy'si de gerekmez: alanlar skaler)
+            st = self.state
+            data = {}
+            for k in _FALLBACK_FIELDS:
+                v = getattr(st, k, _MISSING)
+                if v is not _MISSING:
+                    data[k] = v
+            buf = _state_dumps(data, self.state_path)
+            h = hash(buf)
+            if h == self._last_saved_digest:
+                # dirty ama değer değişmemiş (ör. aynı saniyede gh_seen iki kez) -> disk yazımı yok
+                return True
+
+            tmp = self.state_path + ".tmp"
+            fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                os.write(fd, buf)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            os.replace(tmp, self.state_path)
+            self._last_saved_digest = h
+            return True
+        except (OSError, TypeError, ValueError):
+            # orjson.JSONEncodeError TypeError alt sınıfı; msgpack hataları da TypeError/ValueError
+            return False
 
     # -----------------------------
     # Fingerprints / dedupe
     # -----------------------------
-    def _state_key(self, sig) -> str:
-        side = getattr(sig, "side", "NA")
+    def _state_key(self, sig: Any) -> str:
+        side: str = getattr(sig, "side", "NA")
         entry = _safe_float(getattr(sig, "entry", 0.0), 0.0)
         stop = _safe_float(getattr(sig, "stop", 0.0), 0.0)
         tps = getattr(sig, "tps", []) or []
         tp1 = _safe_float(tps[0], 0.0) if len(tps) >= 1 else 0.0
-        return f"{side}|{entry:.2f}|{stop:.2f}|{tp1:.2f}"
+        return f"{side}|{_cents(entry)}|{_cents(stop)}|{_cents(tp1)}"
+
+    def _fingerprint_open(self, side: str, entry: float, stop: float, tp1: float, tp2: float, tp3: float, tp4: float) -> int:
+        # state key (side|entry|stop|tp1) bu alanların alt kümesi; ayrıca eklemeye gerek yok
+        return _fp64((_FP_OPEN, _SIDE_CODE.get(side, 0), _cents(entry), _cents(stop),
+                      _cents(tp1), _cents(tp2), _cents(tp3), _cents(tp4)))
 
-    def _fingerprint_open(self, side: str, entry: float, stop: float, tp1: float, tp2: float, tp3: float, tp4: float, key: str) -> str:
-        return f"OPEN|{side}|{entry:.2f}|{stop:.2f}|{tp1:.2f}|{tp2:.2f}|{tp3:.2f}|{tp4:.2f}|{key}"
+    def _fingerprint_update(self, side: str, price: float, stop: float, tp1: float, key: str) -> int:
+        return _fp64((_FP_UPD, _SIDE_CODE.get(side, 0), _cents(price), _cents(stop), _cents(tp1)), key.encode())
 
-    def _fingerprint_update(self, side: str, price: float, stop: float, tp1: float, key: str) -> str:
-        return f"UPD|{side}|{price:.2f}|{stop:.2f}|{tp1:.2f}|{key}"
+    def _fingerprint_no_trade(self, side: str, price: float) -> int:
+        return _fp64((_FP_NT, _SIDE_CODE.get(side, 0), _cents(price)))
 
     # -----------------------------
     # Formatters
     # -----------------------------
-    def _fmt_open(self, sig, mem: Dict[str, Any]) -> str:
-        tps = getattr(sig, "tps", []) or []
-        tp1 = _safe_float(tps[0], 0.0) if len(tps) >= 1 else 0.0
-        tp2 = _safe_float(tps[1], 0.0) if len(tps) >= 2 else 0.0
-        tp3 = _safe_float(tps[2], 0.0) if len(tps) >= 3 else 0.0
-        tp4 = _safe_float(tps[3], 0.0) if len(tps) >= 4 else 0.0
-
-        side = getattr(sig, "side", "NA")
-        entry = _safe_float(getattr(sig, "entry", 0.0), 0.0)
-        stop = _safe_float(getattr(sig, "stop", 0.0), 0.0)
-        # GH: entry ± 0.35 * |entry-stop| (only if stop is set)
-        gh = 0.0
-        try:
-            d = abs(entry - stop)
-            if d > 0 and side in ("LONG", "SHORT"):
-                gh = entry + (0.35 * d) if side == "LONG" else entry - (0.35 * d)
-        except Exception:
-            gh = 0.0
-        gh_line = f"• GH: <b>{gh:.2f}</b>\n" if gh else ""
-
-        return (
-            f"🚨 <b>EMRE OPEN</b>\n"
-            f"• {self.symbol} | <b>{side}</b>\n"
-            f"• entry: <b>{entry:.2f}</b>\n"
-            f"• stop: <b>{stop:.2f}</b>\n"
-            f"{gh_line}"
-            f"• TP1: <b>{tp1:.2f}</b>\n"
-            f"• TP2: {tp2:.2f}  TP3: {tp3:.2f}  TP4: {tp4:.2f}\n"
-            f"• struct: {getattr(sig,'structure','')}  trap={getattr(sig,'trap','')}  bias={getattr(sig,'bias_4h','')}\n"
-            f"• time: {_now_str()}\n"
+    def _fmt_open(self, sig) -> str:
+        # seviyeler run() içinde sig'den bir kez parse edilip state'e yazıldı; burada tekrar hesaplanmaz
+        s = self.state
+        side, entry, stop, gh, tp1, tp2, tp3, tp4 = (
+            s.side, s.entry, s.stop, s.gh, s.tp1, s.tp2, s.tp3, s.tp4
+        )
+        return _OPEN_TMPL.format(
+            self.symbol, side, entry, stop,
+            _GH_LINE_TMPL.format(gh, "") if gh else "",
+            tp1, tp2, tp3, tp4,
+            getattr(sig, "structure", ""), getattr(sig, "trap", ""), getattr(sig, "bias_4h", ""),
+            _now_str(),
         )
 
     def _fmt_update(self, mem: Dict[str, Any]) -> str:
-        side = getattr(self.state, "side", "NA")
-        entry = _safe_float(getattr(self.state, "entry", 0.0), 0.0)
-        stop = _safe_float(getattr(self.state, "stop", 0.0), 0.0)
-        gh = _safe_float(getattr(self.state, "gh", 0.0), 0.0)
-        gh_seen = bool(getattr(self.state, "gh_seen", False))
-        gh_flag = "✅" if gh_seen else "⏳"
-        gh_line = f"• GH: <b>{gh:.2f}</b> {gh_flag}\n" if gh else ""
-        tp1 = _safe_float(getattr(self.state, "tp1", 0.0), 0.0)
+        s = self.state
+        side, entry, stop, gh, gh_seen, tp1, tp1_hit, structure, trap, bias = (
+            s.side, s.entry, s.stop, s.gh, s.gh_seen, s.tp1, s.tp1_hit, s.structure, s.trap, s.bias_4h
+        )
         price = _safe_float((mem.get("1m") or {}).get("price"), 0.0)
-
-        tp1_hit = bool(getattr(self.state, "tp1_hit", False))
-        tp1_flag = "✅" if tp1_hit else "⏳"
-
-        return (
-            f"🔁 <b>EMRE UPDATE</b>\n"
-            f"• {self.symbol} | <b>{side}</b>\n"
-            f"• price: <b>{price:.2f}</b> | entry: {entry:.2f}\n"
-            f"• stop: <b>{stop:.2f}</b>\n"
-            f"{gh_line}"
-            f"• TP1: <b>{tp1:.2f}</b> {tp1_flag}\n"
-            f"• struct: {getattr(self.state,'structure','')}  trap={getattr(self.state,'trap','')}  bias={getattr(self.state,'bias_4h','')}\n"
-            f"• time: {_now_str()}\n"
+        return _UPDATE_TMPL.format(
+            self.symbol, side, price, entry, stop,
+            _GH_LINE_TMPL.format(gh, " ✅" if gh_seen else " ⏳") if gh else "",
+            tp1, "✅" if tp1_hit else "⏳",
+            structure, trap, bias,
+            _now_str(),
         )
 
+    def _fmt_gh_seen(self, side: str, price: float, gh: float) -> str:
+        return _GH_SEEN_TMPL.format(self.symbol, side, price, gh, _now_str())
+
     def _fmt_exit(self, reason: str) -> str:
-        return (
-            f"🧯 <b>EMRE EXIT</b>\n"
-            f"• reason: {reason}\n"
-            f"• time: {_now_str()}\n"
-        )
+        return _EXIT_TMPL.format(reason, _now_str())
 
     def _fmt_no_trade(self, sig, mem: Dict[str, Any]) -> str:
         side = getattr(sig, "side", "NO-TRADE")
         price = _safe_float((mem.get("1m") or {}).get("price"), 0.0)
-        return (
-            f"🟨 <b>EMRE NO-TRADE</b>\n"
-            f"• {self.symbol} | {side}\n"
-            f"• price: {price:.2f}\n"
-            f"• time: {_now_str()}\n"
-        )
+        return _NO_TRADE_TMPL.format(self.symbol, side, price, _now_str())
 
     def _fmt_status(self, mem: Dict[str, Any]) -> str:
         price = _safe_float((mem.get("1m") or {}).get("price"), 0.0)
-        is_open = bool(getattr(self.state, "is_open", False))
-        side = getattr(self.state, "side", "NA")
-        return (
-            f"🛰 <b>EMRE STATUS</b>\n"
-            f"• {self.symbol}\n"
-            f"• is_open: {is_open} side={side}\n"
-            f"• price: {price:.2f}\n"
-            f"• time: {_now_str()}\n"
-        )
+        s = self.state
+        return _STATUS_TMPL.format(self.symbol, bool(s.is_open), s.side, price, _now_str())
 
     # -----------------------------
     # Market + Trader step
     # -----------------------------
     def step(self) -> Tuple[Optional[Any], Dict[str, Any]]:
-        mem: Dict[str, Any] = {}
+        mem = self._mem
         mkt = self._get_market()
         mkt.update_memory(mem)
 
         # Trader
-        from emre_trader import decide
-        sig = decide(mem)
+        if _decide is None:
+            raise ImportError("emre_trader.decide import edilemedi")
+        sig = _decide(mem)
         return sig, mem
 
     # -----------------------------
     # TP1 hit marker (price touches TP1)
     # -----------------------------
-    def _maybe_mark_tp1(self, price: float):
-        try:
-            tp1 = _safe_float(getattr(self.state, "tp1", 0.0), 0.0)
-            side = getattr(self.state, "side", "NA")
-            if not tp1 or side not in ("LONG", "SHORT"):
-                return
-
-            if side == "LONG" and price >= tp1:
-                if not getattr(self.state, "tp1_hit", False):
-                    setattr(self.state, "tp1_hit", True)
-                    self._save_state()
-            if side == "SHORT" and price <= tp1:
-                if not getattr(self.state, "tp1_hit", False):
-                    setattr(self.state, "tp1_hit", True)
-                    self._save_state()
-        except Exception:
-            pass
+    def _maybe_mark_tp1(self, price: float) -> None:
+        s = self.state
+        tp1 = s.tp1
+        side = s.side
+        if not tp1 or side not in ("LONG", "SHORT"):
+            return
+
+        if side == "LONG" and price >= tp1:
+            if not s.tp1_hit:
+                s.tp1_hit = True
+                self._mark_dirty()
+        if side == "SHORT" and price <= tp1:
+            if not s.tp1_hit:
+                s.tp1_hit = True
+                self._mark_dirty()
+
+    # -----------------------------
+    # Scheduling
+    # -----------------------------
+    def _next_due(self, now: float) -> float:
+        """Bir sonraki kadans olayının monotonic zamanı (gelecekte yoksa inf)."""
+        s = self.state
+        dues = []
+        if s.is_open:
+            dues.append(self._last_update_mono + self.UPDATE_EVERY_SEC)
+            if s.gh and not s.gh_seen and s.opened_ts:
+                dues.append(self._opened_mono + self.GH_WINDOW_SEC)
+        else:
+            dues.append(self._last_nt_mono + self.FLAT_EVERY_SEC)
+            if self.status_interval_sec > 0:
+                dues.append(self._last_status_ts + self.status_interval_sec)
+        future = [d for d in dues if d > now]
+        return min(future) if future else float("inf")
 
     # -----------------------------
     # Main loop
     # -----------------------------
-    def run(self):
+    def run(self) -> None:
         # NOTE: We keep hard-coded cadences for stability:
         # - flat no-trade: 1h fixed
-        # - open update: fixed interval (set below)
+        # - open update: fixed interval (class constants)
         # This prevents "restart once then silence" style surprises.
-
-        FLAT_EVERY_SEC = 3600
-        UPDATE_EVERY_SEC = 900  # 15dk update (pozisyon açıkken)
-        GH_WINDOW_SEC = 900        # 15dk içinde GH görülmezse pozisyonu kapat (silent)
-        GH_FACTOR = 0.35            # GH = entry ± GH_FACTOR * |entry-stop|
+        #
+        # Uyku mutlak zamana göre: bir sonraki market poll'u (son poll + POLL_OPEN/POLL_FLAT)
+        # ile bir sonraki kadans deadline'ından hangisi önceyse o an uyanılır.
+        # Poll aralığı pozisyon açıkken kısa (GH/TP1 taze fiyat ister), flat iken uzun;
+        # poll'lar arasındaki kadans uyanışları son sig/mem ile çalışır.
+
+        FLAT_EVERY_SEC: float = self.FLAT_EVERY_SEC
+        UPDATE_EVERY_SEC: float = self.UPDATE_EVERY_SEC
+        GH_WINDOW_SEC: float = self.GH_WINDOW_SEC
+        GH_FACTOR: float = self.GH_FACTOR
+
+        # step() bağımlılıkları döngü dışında bir kez çözülür
+        update_memory = self._get_market().update_memory
+        if _decide is None:
+            raise ImportError("emre_trader.decide import edilemedi")
+        decide = _decide
+        mem: Dict[str, Any] = self._mem
+        POLL_OPEN: float = self.loop_sleep
+        POLL_FLAT: float = max(self.loop_sleep, self.MARKET_POLL_SEC_FLAT)
+
+        sig: Any = None
+        last_step_ts: float = float("-inf")
 
         while True:
+            tick_start: float = time.monotonic()
+            # state nesnesi run() boyunca yeniden atanmaz; tek local alias yeterli
+            s = self.state
             try:
-                sig, mem = self.step()
+                if sig is None or (tick_start - last_step_ts) >= (POLL_OPEN if s.is_open else POLL_FLAT):
+                    last_step_ts = tick_start
+                    update_memory(mem)
+                    sig = decide(mem)
                 if sig is None:
-                    time.sleep(self.loop_sleep)
                     continue
 
-                now = time.time()
-                price = _safe_float((mem.get("1m") or {}).get("price"), 0.0)
+                now: float = time.monotonic()
+                wall: float = time.time()  # yalnız state'e yazılan damgalar için
+                price: float = _safe_float((mem.get("1m") or {}).get("price"), 0.0)
 
-                side = getattr(sig, "side", "NO-TRADE") or "NO-TRADE"
+                side: str = getattr(sig, "side", "NO-TRADE") or "NO-TRADE"
 
                 # 1) If position open: mark TP1 hit
-                if getattr(self.state, "is_open", False) and price:
+                if s.is_open and price:
                     self._maybe_mark_tp1(price)
 
                 # 2) If we HAVE an open position, UPDATE cadence is fixed, independent from momentum/signal.
-                if getattr(self.state, "is_open", False):
-                    cur_side = getattr(self.state, "side", "NA")
+                if s.is_open:
+                    cur_side = s.side
 
                     # GH check (once) + timeout close (silent)
                     try:
-                        gh = _safe_float(getattr(self.state, "gh", 0.0), 0.0)
-                        gh_seen = bool(getattr(self.state, "gh_seen", False))
-                        opened_ts = _safe_float(getattr(self.state, "opened_ts", 0.0), 0.0)
+                        gh = s.gh
+                        gh_seen = bool(s.gh_seen)
                         if gh and (not gh_seen):
                             if (cur_side == "LONG" and price >= gh) or (cur_side == "SHORT" and price <= gh):
-                                setattr(self.state, "gh_seen", True)
-                                self._save_state()
-                                self._send(
-                                    f"🎯 <b>GH GORULDU</b>\n"
-                                    f"• {self.symbol} | <b>{cur_side}</b>\n"
-                                    f"• price: <b>{price:.2f}</b>  GH: <b>{gh:.2f}</b>\n"
-                                    f"• time: {_now_str()}\n"
-                                )
-                                self._last_telegram_ts = now
-                            elif opened_ts and (now - opened_ts) >= GH_WINDOW_SEC:
-                                setattr(self.state, "is_open", False)
-                                self._save_state()
-                                time.sleep(self.loop_sleep)
+                                s.gh_seen = True
+                                self._mark_dirty()
+                                self._queue(self._fmt_gh_seen(cur_side, price, gh))
+                            elif s.opened_ts and (now - self._opened_mono) >= GH_WINDOW_SEC:
+                                s.is_open = False
+                                self._mark_dirty()
                                 continue
-                    except Exception:
+                    except (AttributeError, ValueError, TypeError):
                         pass
 
 
                     # If signal shows a clear reverse (LONG<->SHORT), EXIT then allow OPEN below.
                     if side in ("LONG", "SHORT") and cur_side in ("LONG", "SHORT") and side != cur_side:
-                        self._send(self._fmt_exit("Yön değişti (state)"))
-                        self._last_telegram_ts = now
+                        self._queue(self._fmt_exit("Yön değişti (state)"))
 
                         # close state
-                        setattr(self.state, "is_open", False)
-                        self._save_state()
+                        s.is_open = False
+                        self._mark_dirty()
                         # continue to OPEN handling below (same tick)
 
                     else:
-                        last_upd = _safe_float(getattr(self.state, "last_update_ts", 0.0), 0.0)
-
-                        if (now - last_upd) >= UPDATE_EVERY_SEC:
+                        if (now - self._last_update_mono) >= UPDATE_EVERY_SEC:
                             # Best-effort: refresh some state fields from latest signal when same side
                             try:
                                 if side in ("LONG", "SHORT") and side == cur_side:
                                     new_stop = _safe_float(getattr(sig, "stop", 0.0), 0.0)
                                     if new_stop:
-                                        setattr(self.state, "stop", float(new_stop))
+                                        s.stop = float(new_stop)
                                 # Keep context updated
-                                setattr(self.state, "structure", getattr(sig, "structure", getattr(self.state, "structure", "NA")))
-                                setattr(self.state, "trap", getattr(sig, "trap", getattr(self.state, "trap", "NA")))
-                                setattr(self.state, "bias_4h", getattr(sig, "bias_4h", getattr(self.state, "bias_4h", "NA")))
+                                s.structure = getattr(sig, "structure", s.structure)
+                                s.trap = getattr(sig, "trap", s.trap)
+                                s.bias_4h = getattr(sig, "bias_4h", s.bias_4h)
                                 # Update last price
                                 if price:
-                                    setattr(self.state, "last_price", float(price))
-                                setattr(self.state, "last_update_ts", now)
+                                    s.last_price = float(price)
+                                s.last_update_ts = wall
+                                self._last_update_mono = now
                                 # Update state key for dedupe/debug visibility
                                 if side in ("LONG", "SHORT"):
-                                    setattr(self.state, "last_state_key", self._state_key(sig))
-                                self._save_state()
-                            except Exception:
+                                    s.last_state_key = self._state_key(sig)
+                                self._mark_dirty()
+                            except (AttributeError, ValueError, TypeError):
                                 pass
 
                             # Send UPDATE (dedupe fingerprint)
@@ -439,20 +703,17 @@ class EmreCore:
                                 fp = self._fingerprint_update(
                                     cur_side,
                                     float(price or 0.0),
-                                    _safe_float(getattr(self.state, "stop", 0.0), 0.0),
-                                    _safe_float(getattr(self.state, "tp1", 0.0), 0.0),
-                                    getattr(self.state, "last_state_key", "") or ""
+                                    s.stop,
+                                    s.tp1,
+                                    s.last_state_key or ""
                                 )
-                                last_fp = getattr(self.state, "last_sent_fp", "") or ""
-                                if fp != last_fp:
-                                    self._send(self._fmt_update(mem))
-                                    self._last_telegram_ts = now
-                                    setattr(self.state, "last_sent_fp", fp)
-                                    self._save_state()
-                            except Exception:
+                                if fp != s.last_sent_fp:
+                                    self._queue(self._fmt_update(mem))
+                                    s.last_sent_fp = fp
+                                    self._mark_dirty()
+                            except (AttributeError, ValueError, TypeError):
                                 pass
 
-                        time.sleep(self.loop_sleep)
                         continue
 
                 # 3) If NO open position:
@@ -469,70 +730,91 @@ class EmreCore:
                     tp3 = _safe_float(tps[2], 0.0) if len(tps) >= 3 else 0.0
                     tp4 = _safe_float(tps[3], 0.0) if len(tps) >= 4 else 0.0
 
-                    fp_open = self._fingerprint_open(side, entry, stop, tp1, tp2, tp3, tp4, key)
-                    last_fp = getattr(self.state, "last_sent_fp", "") or ""
-                    if fp_open != last_fp:
-                        setattr(self.state, "is_open", True)
-                        setattr(self.state, "side", side)
-                        setattr(self.state, "entry", float(entry))
-                        setattr(self.state, "stop", float(stop))
+                    fp_open = self._fingerprint_open(side, entry, stop, tp1, tp2, tp3, tp4)
+                    if fp_open != s.last_sent_fp:
+                        s.is_open = True
+                        s.side = side
+                        s.entry = float(entry)
+                        s.stop = float(stop)
                         # GH (Geçici Hedef): entry ± GH_FACTOR * |entry-stop|
-                        try:
-                            d = abs(float(entry) - float(stop))
-                            gh = 0.0
-                            if d > 0 and side in ("LONG", "SHORT"):
-                                gh = float(entry) + (GH_FACTOR * d) if side == "LONG" else float(entry) - (GH_FACTOR * d)
-                            setattr(self.state, "gh", float(gh))
-                            setattr(self.state, "gh_seen", False)
-                        except Exception:
-                            setattr(self.state, "gh", 0.0)
-                            setattr(self.state, "gh_seen", False)
-                        setattr(self.state, "tp1", float(tp1))
-                        setattr(self.state, "tp2", float(tp2))
-                        setattr(self.state, "tp3", float(tp3))
-                        setattr(self.state, "tp4", float(tp4))
-
-                        setattr(self.state, "structure", getattr(sig, "structure", "NA"))
-                        setattr(self.state, "trap", getattr(sig, "trap", "NA"))
-                        setattr(self.state, "bias_4h", getattr(sig, "bias_4h", "NA"))
-
-                        setattr(self.state, "opened_ts", now)
-                        setattr(self.state, "last_update_ts", now)
-                        setattr(self.state, "tp1_hit", False)
-                        setattr(self.state, "last_state_key", key)
-                        try:
-                            setattr(self.state, "last_sent_fp", fp_open)
-                            if price:
-                                setattr(self.state, "last_price", float(price))
-                        except Exception:
-                            pass
-
-                        self._save_state()
-
-                        self._send(self._fmt_open(sig, mem))
-                        self._last_telegram_ts = now
-
-                    time.sleep(self.loop_sleep)
+                        # entry/stop _safe_float'tan geldiği için float; hata yolu yok
+                        d = abs(entry - stop)
+                        gh = 0.0
+                        if d > 0:
+                            gh = entry + (GH_FACTOR * d) if side == "LONG" else entry - (GH_FACTOR * d)
+                        s.gh = gh
+                        s.gh_seen = False
+                        s.tp1 = float(tp1)
+                        s.tp2 = float(tp2)
+                        s.tp3 = float(tp3)
+                        s.tp4 = float(tp4)
+
+                        s.structure = getattr(sig, "structure", "NA")
+                        s.trap = getattr(sig, "trap", "NA")
+                        s.bias_4h = getattr(sig, "bias_4h", "NA")
+
+                        s.opened_ts = wall
+                        s.last_update_ts = wall
+                        self._opened_mono = now
+                        self._last_update_mono = now
+                        s.tp1_hit = False
+                        s.last_state_key = key
+                        s.last_sent_fp = fp_open
+                        if price:
+                            try:
+                                s.last_price = float(price)
+                            except AttributeError:
+                                # dış state last_price alanı taşımayabilir
+                                pass
+
+                        self._mark_dirty()
+
+                        self._queue(self._fmt_open(sig))
+
                     continue
 
-                # 4) NO-TRADE while flat: strictly 1 msg/hour
-                if (now - self._last_no_trade_ts) >= FLAT_EVERY_SEC:
-                    self._send(self._fmt_no_trade(sig, mem))
-                    self._last_telegram_ts = now
-                    self._last_no_trade_ts = now
+                # 4) NO-TRADE while flat: strictly 1 msg/hour (zaman state'te: restart'ta sıfırlanmaz)
+                #    + içerik aynıysa (side|price) tekrar gönderme
+                if (now - self._last_nt_mono) >= FLAT_EVERY_SEC:
+                    fp_nt = self._fingerprint_no_trade(side, price)
+                    if fp_nt != s.last_nt_fp:
+                        self._queue(self._fmt_no_trade(sig, mem))
+                        s.last_nt_ts = wall
+                        self._last_nt_mono = now
+                        s.last_nt_fp = fp_nt
+                        self._mark_dirty()
 
                 # 5) Optional STATUS cadence
                 if self.status_interval_sec > 0:
                     if (now - self._last_status_ts) >= self.status_interval_sec:
-                        self._send(self._fmt_status(mem))
-                        self._last_telegram_ts = now
+                        self._queue(self._fmt_status(mem))
                         self._last_status_ts = now
 
-            except Exception:
-                # never crash service loop
-                pass
-
-            time.sleep(self.loop_sleep)
+            except Exception as e:
+                # never crash service loop (tek geniş catch: en dış seviye)
+                if self.debug_log:
+                    print(f"[EMRE] tick error: {type(e).__name__}: {e}")
+            finally:
+                # tick sonu: biriken mesajları tek POST'ta gönder, state değişikliklerini tek yazımda diske al.
+                # epilog de servis döngüsünü düşürmemeli (aynı geniş catch); her adım ayrı: TG hatası save'i engellemez
+                try:
+                    self._flush_tg()
+                except Exception as e:
+                    self._tg_buf.clear()   # aynı bozuk mesaj her tick'te yeniden denenmez
+                    if self.debug_log:
+                        print(f"[EMRE] tg flush error: {type(e).__name__}: {e}")
+                try:
+                    self._flush_state()
+                except Exception as e:
+                    if self.debug_log:
+                        print(f"[EMRE] state flush error: {type(e).__name__}: {e}")
+                now = time.monotonic()
+                wake_at = last_step_ts + (POLL_OPEN if s.is_open else POLL_FLAT)
+                try:
+                    wake_at = min(wake_at, self._next_due(now))
+                except Exception:
+                    pass
+                time.sleep(max(0.0, wake_at - now))
 
 
 _core_singleton: Optional[EmreCore] = None
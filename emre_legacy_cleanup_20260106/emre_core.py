@@ -1,23 +1,42 @@
-import os, time, json
-from dataclasses import dataclass, asdict
+import os, time, json, mmap, struct
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from emre_tp_micro import compute_tp1
 from emre_tp_targets import compute_targets, compute_plan
 
 UTC3 = timezone(timedelta(hours=3))
-def now(): return datetime.now(UTC3).strftime("%H:%M:%S")
+# saniye başına bir kez formatla (tek thread'li döngü, kilit gerekmez)
+_now_cache = [0, ""]
+def now():
+    t = int(time.time())
+    if t != _now_cache[0]:
+        _now_cache[0] = t
+        _now_cache[1] = datetime.fromtimestamp(t, UTC3).strftime("%H:%M:%S")
+    return _now_cache[1]
+
+def json_loads(buf):
+    if orjson is not None:
+        return orjson.loads(buf)
+    return json.loads(buf)
 
 def safe_float(x, d=0.0):
+    # çoğu değer zaten float: try/float() atlanır
+    if type(x) is float: return x
     try: return float(x)
-    except: return d
+    except (TypeError, ValueError, OverflowError): return d
 
 def env_int(k, d):
     try: return int(os.getenv(k, d))
-    except: return d
+    except (TypeError, ValueError): return d
 
 
-@dataclass
+@dataclass(slots=True)
 class State:
     is_open: bool = False
     side: str = "NA"
@@ -28,6 +47,25 @@ class State:
     tp1_sent: bool = False
     plan_sent: bool = False
     opened_ts: float = 0.0
+    # |gh - entry|: pozisyon boyunca sabit; binary dosyada tutulmaz, yüklemede türetilir
+    gh_dist: float = field(default=0.0, init=False)
+
+    def __post_init__(self):
+        self.gh_dist = abs(self.gh - self.entry)
+
+    def reset(self):
+        # kapanışta yeni nesne yerine yerinde varsayılanlara dön
+        self.__init__()
+
+
+# Sabit düzenli binary state (48 byte, tek sayfa):
+# magic | is_open u8 | side u8 | tp1_sent u8 | plan_sent u8 | entry stop gh tp1 opened_ts f64
+STATE_FMT = struct.Struct("<4s4B5d")
+STATE_MAGIC = b"EMS1"
+SIDE_CODE = {"NA": 0, "LONG": 1, "SHORT": 2}
+SIDE_NAME = ("NA", "LONG", "SHORT")
+# eksik mem bölümleri için paylaşılan boş dict (yalnız okunur; tick başına tahsis yok)
+_EMPTY_DICT = {}
 
 
 class EmreCore:
@@ -36,36 +74,106 @@ class EmreCore:
         self.loop_sleep = env_int("EMRE_LOOP_SLEEP_SEC", 10)
         self.energy_timeout = env_int("EMRE_ENERGY_TIMEOUT_SEC", 1800)
         self.heartbeat_sec = env_int("EMRE_HEARTBEAT_SEC", 60)
-        self.state_path = "/opt/emre/emre_state.json"
+        self.state_path = "/opt/emre/emre_state.bin"
+        # eski JSON state: yalnız binary dosya yokken bir kez okunur (geçiş)
+        self.legacy_state_path = "/opt/emre/emre_state.json"
+        self._mm = None
         self.state = self._load_state()
+        # son diske yazılan state'in değer tuple'ı (aynıysa _save_state yazmaz)
+        self._last_state_sig = None
+        # yalnız eski JSON varsa: hemen binary'ye taşı, JSON'u emekliye ayır (bir daha okunmaz)
+        if not os.path.exists(self.state_path) and os.path.exists(self.legacy_state_path):
+            try:
+                self._save_state()
+                os.replace(self.legacy_state_path, self.legacy_state_path + ".migrated")
+            except OSError:
+                pass   # taşınamadı: state bellekte, sonraki açılışta yeniden denenir
         self._market = None
-        self._last_hb = 0
-        self._last_continue = 0
-        self._last_hourly = 0
+        # tick'ler arasında yeniden kullanılan market belleği (update_memory clear() + doldurur)
+        self._mem = {}
+        # trader/telegram bir kez bağlanır (her tick import yok); EmreMarket lazy kalır
+        from emre_trader import decide
+        from telegram_sender import send_message
+        self._decide = decide
+        self._send_message = send_message
+        # tick içinde biriken mesajlar; tick sonunda tek istekte gider
+        self._outbox = []
+        # state bu tick'te değişti mi? (tick sonunda en fazla 1 yazım)
+        self._dirty = False
+        # aralık kontrolleri monotonic saatte (NTP/date adımlarından etkilenmez); -inf: ilk tick'te tetikle
+        self._last_hb = float("-inf")
+        self._last_continue = float("-inf")
+        self._last_hourly = float("-inf")
 
     def _load_state(self):
         if os.path.exists(self.state_path):
             try:
-                with open(self.state_path) as f:
-                    raw = json.load(f)
+                with open(self.state_path, "rb") as f:
+                    buf = f.read(STATE_FMT.size)
+                magic, is_open, side, tp1_sent, plan_sent, entry, stop, gh, tp1, opened_ts = STATE_FMT.unpack(buf)
+                if magic == STATE_MAGIC:
+                    return State(
+                        is_open=bool(is_open),
+                        side=SIDE_NAME[side] if side < len(SIDE_NAME) else "NA",
+                        entry=entry,
+                        stop=stop,
+                        gh=gh,
+                        tp1=tp1,
+                        tp1_sent=bool(tp1_sent),
+                        plan_sent=bool(plan_sent),
+                        opened_ts=opened_ts,
+                    )
+            except (OSError, struct.error):
+                pass
+            # .bin var ama okunamıyor/magic bozuk: eski JSON'a dönme (bayat pozisyonu geri getirir)
+            return State()
+        if os.path.exists(self.legacy_state_path):
+            try:
+                with open(self.legacy_state_path, "rb") as f:
+                    raw = json_loads(f.read())
+                # JSON'da null / "123" gibi değerler olabilir: binary pack_into'ya girmeden tiplenir
+                side = raw.get("side")
                 return State(
-                    is_open=raw.get("is_open", False),
-                    side=raw.get("side", "NA"),
-                    entry=raw.get("entry", 0.0),
-                    stop=raw.get("stop", 0.0),
-                    gh=raw.get("gh", 0.0),
-                    tp1=raw.get("tp1", 0.0),
-                    tp1_sent=raw.get("tp1_sent", False),
-                    plan_sent=raw.get("plan_sent", False),
-                    opened_ts=raw.get("opened_ts", 0.0),
+                    is_open=bool(raw.get("is_open")),
+                    side=side if side in SIDE_CODE else "NA",
+                    entry=safe_float(raw.get("entry"), 0.0),
+                    stop=safe_float(raw.get("stop"), 0.0),
+                    gh=safe_float(raw.get("gh"), 0.0),
+                    tp1=safe_float(raw.get("tp1"), 0.0),
+                    tp1_sent=bool(raw.get("tp1_sent")),
+                    plan_sent=bool(raw.get("plan_sent")),
+                    opened_ts=safe_float(raw.get("opened_ts"), 0.0),
                 )
-            except:
+            except (OSError, ValueError, TypeError, AttributeError):
                 pass
         return State()
 
+    def _state_map(self):
+        # dosya bir kez açılıp map'lenir; sonraki save'ler yalnız değişen baytları yazar
+        if self._mm is None:
+            fd = os.open(self.state_path, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size < STATE_FMT.size:
+                    os.ftruncate(fd, STATE_FMT.size)
+                self._mm = mmap.mmap(fd, STATE_FMT.size)
+            finally:
+                os.close(fd)
+        return self._mm
+
     def _save_state(self):
-        with open(self.state_path, "w") as f:
-            json.dump(asdict(self.state), f, indent=2)
+        st = self.state
+        sig = (st.is_open, st.side, st.entry, st.stop, st.gh, st.tp1, st.tp1_sent, st.plan_sent, st.opened_ts)
+        if sig == self._last_state_sig:
+            return
+        # 48 byte tek sayfada kalır: JSON serileştirme ve tmp+rename gerekmez
+        mm = self._state_map()
+        STATE_FMT.pack_into(
+            mm, 0, STATE_MAGIC,
+            st.is_open, SIDE_CODE.get(st.side, 0), st.tp1_sent, st.plan_sent,
+            st.entry, st.stop, st.gh, st.tp1, st.opened_ts,
+        )
+        mm.flush()
+        self._last_state_sig = sig
 
     def _market_obj(self):
         if not self._market:
@@ -74,58 +182,91 @@ class EmreCore:
         return self._market
 
     def _send(self, msg):
-        from telegram_sender import send_message
-        send_message(msg)
+        self._outbox.append(msg)
+
+    def _flush_outbox(self):
+        if self._outbox:
+            self._send_message("\n---\n".join(self._outbox))
+            self._outbox.clear()
+
+    def _close_position(self, reason):
+        # tüm kapanış yolları (STOP / ters sinyal / energy) tek yerden: reset + mesaj + dirty
+        s = self.state
+        self._send(f"[CLOSE:{reason}] {self.symbol} {s.side} entry={s.entry:.2f} time={now()}")
+        s.reset()
+        self._dirty = True
 
     def _open_msg(self):
+        s = self.state
         return (
-            f"EMRE OPEN {self.symbol} {self.state.side}\n"
-            f"entry: {self.state.entry:.2f}\n"
-            f"stop: {self.state.stop:.2f}\n"
-            f"GH: {self.state.gh:.2f}\n"
+            f"EMRE OPEN {self.symbol} {s.side}\n"
+            f"entry: {s.entry:.2f}\n"
+            f"stop: {s.stop:.2f}\n"
+            f"GH: {s.gh:.2f}\n"
             f"TP1: bekleniyor\n"
             f"time: {now()}"
         )
 
     def _tp1_msg(self):
+        s = self.state
         return (
-            f"TP1 ONAY {self.symbol} {self.state.side}\n"
-            f"TP1: {self.state.tp1:.2f}\n"
+            f"TP1 ONAY {self.symbol} {s.side}\n"
+            f"TP1: {s.tp1:.2f}\n"
             f"time: {now()}"
         )
 
     def _plan_msg(self, tp2, tp3, tp4, regime):
+        s = self.state
         return (
-            f"EMRE PLAN {self.symbol} {self.state.side}\n"
+            f"EMRE PLAN {self.symbol} {s.side}\n"
             f"TP2: {tp2:.2f}\n"
             f"TP3: {tp3:.2f}\n"
             f"TP4: {tp4:.2f}\n"
             f"regime: {regime}\n"
-            f"stop: {self.state.stop:.2f}\n"
+            f"stop: {s.stop:.2f}\n"
             f"time: {now()}"
         )
 
+    def _continue_msg(self, price):
+        s = self.state
+        return (
+            f"[DEVAM] {self.symbol} {s.side} "
+            f"entry={s.entry:.2f} stop={s.stop:.2f} "
+            f"gh={s.gh:.2f} price={price:.2f} time={now()}"
+        )
+
+    def _hourly_msg(self, price):
+        s = self.state
+        return (
+            f"[SAATLIK] {self.symbol} is_open={s.is_open} "
+            f"side={s.side} price={price:.2f} time={now()}"
+        )
+
     def _heartbeat(self, price):
+        s = self.state
         print(
             f"[HEARTBEAT] {now()} "
-            f"is_open={self.state.is_open} "
-            f"side={self.state.side} "
+            f"is_open={s.is_open} "
+            f"side={s.side} "
             f"price={price:.2f}"
         )
 
     def step(self):
-        mem = {}
+        mem = self._mem
         self._market_obj().update_memory(mem)
-        from emre_trader import decide
-        return decide(mem), mem
+        return self._decide(mem), mem
 
     def loop(self):
         print("=== EMRE Core started ===")
+        # mutlak deadline: tick süresi periyoda eklenmez, uzun vadede kayma olmaz
+        next_tick = time.monotonic()
         while True:
+            self._dirty = False
             sig, mem = self.step()
-            now_ts = time.time()
+            now_ts = time.monotonic()
             side = getattr(sig, "side", "NO-TRADE")
-            price = safe_float(mem.get("1m", {}).get("price"), 0.0)
+            m1 = mem.get("1m") or _EMPTY_DICT
+            price = safe_float(m1.get("price"), 0.0)
 
             # HEARTBEAT
             if now_ts - self._last_hb >= self.heartbeat_sec:
@@ -135,19 +276,12 @@ class EmreCore:
             # DEVAM (15 dk) - pozisyon açıksa düzenli “yaşıyor” mesajı
             if self.state.is_open and (now_ts - self._last_continue) >= 900:
                 self._last_continue = now_ts
-                self._send(
-                    f"[DEVAM] {self.symbol} {self.state.side} "
-                    f"entry={self.state.entry:.2f} stop={self.state.stop:.2f} "
-                    f"gh={self.state.gh:.2f} price={price:.2f} time={now()}"
-                )
+                self._send(self._continue_msg(price))
 
             # SAATLIK (1h) - sistem yaşıyor mesajı (pozisyon açık/kapalı)
             if (now_ts - self._last_hourly) >= 3600:
                 self._last_hourly = now_ts
-                self._send(
-                    f"[SAATLIK] {self.symbol} is_open={self.state.is_open} "
-                    f"side={self.state.side} price={price:.2f} time={now()}"
-                )
+                self._send(self._hourly_msg(price))
 
             # 1) STOP (mutlak kapatma)
             if self.state.is_open:
@@ -155,14 +289,14 @@ class EmreCore:
                     (self.state.side == "LONG" and price <= self.state.stop) or
                     (self.state.side == "SHORT" and price >= self.state.stop)
                 ):
-                    self.state = State()
-                    self._save_state()
+                    self._close_position("STOP")
+                    self._save_state()   # tick'in tek değişikliği; aşağıdaki sona uğramadan döner
+                    self._flush_outbox()
                     continue
 
             # 2) TERS SİNYAL (kapat, sonra OPEN bloğu yeni yönü açacak)
             if self.state.is_open and side in ("LONG", "SHORT") and side != self.state.side:
-                self.state = State()
-                self._save_state()
+                self._close_position("REVERSE")
 
             # OPEN
             if not self.state.is_open and side in ("LONG", "SHORT"):
@@ -172,16 +306,17 @@ class EmreCore:
                     entry=safe_float(getattr(sig, "entry", price)),
                     stop=0.0,
                     gh=0.0,
-                    opened_ts=now_ts,
+                    opened_ts=time.time(),   # state'e yazılır: restart'ta da geçerli wall-clock
                 )
 
                 # Entry-aligned plan (Stop + GH(H1) + TP2/3/4)
                 stop, gh, tp2, tp3, tp4, regime = compute_plan(mem, self.state.entry, side)
                 self.state.stop = safe_float(stop, 0.0)
                 self.state.gh = safe_float(gh, self.state.entry)
+                self.state.gh_dist = abs(self.state.gh - self.state.entry)
                 self.state.plan_sent = True
 
-                self._save_state()
+                self._dirty = True
                 self._send(self._open_msg())
                 self._send(self._plan_msg(tp2, tp3, tp4, regime))
 
@@ -196,7 +331,7 @@ class EmreCore:
                         self.state.stop = self.state.entry - 0.2 * D
                     else:
                         self.state.stop = self.state.entry + 0.2 * D
-                    self._save_state()
+                    self._dirty = True
                     self._send(self._tp1_msg())
 
             # PLAN (dokunulmadı)
@@ -205,17 +340,25 @@ class EmreCore:
                     mem, self.state.entry, self.state.side, self.state.tp1
                 )
                 self.state.plan_sent = True
-                self._save_state()
+                self._dirty = True
                 self._send(self._plan_msg(tp2, tp3, tp4, regime))
 
             # ENERGY STOP (dokunulmadı)
             if self.state.is_open:
-                if now_ts - self.state.opened_ts > self.energy_timeout:
-                    if abs(price - self.state.entry) < abs(self.state.gh - self.state.entry):
-                        self.state = State()
-                        self._save_state()
+                if time.time() - self.state.opened_ts > self.energy_timeout:
+                    if abs(price - self.state.entry) < self.state.gh_dist:
+                        self._close_position("ENERGY")
 
-            time.sleep(self.loop_sleep)
+            if self._dirty:
+                self._save_state()
+            self._flush_outbox()
+            next_tick += self.loop_sleep
+            delay = next_tick - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # geride kaldık: yetişmek için art arda tick atma, takvimi sıfırla
+                next_tick = time.monotonic()
 
 
 def run():
@@ -1,13 +1,24 @@
 # emre_state.py
 import time
+from dataclasses import dataclass, asdict
 
 
+@dataclass(slots=True)
 class TradeState:
-    def __init__(self):
-        self.reset()
+    status: str = "FLAT"        # FLAT | OPEN
+    side: str | None = None
+    entry: float | None = None
+    stop: float | None = None
+    tp1: float | None = None
+    tp2: float | None = None
+    tp3: float | None = None
+
+    tp1_hit: bool = False
+    opened_at: float | None = None
+    last_update: float | None = None
 
     def reset(self):
-        self.status = "FLAT"        # FLAT | OPEN
+        self.status = "FLAT"
         self.side = None
         self.entry = None
         self.stop = None
@@ -42,15 +53,10 @@ class TradeState:
         return self.status == "OPEN"
 
     def snapshot(self):
-        return {
-            "status": self.status,
-            "side": self.side,
-            "entry": self.entry,
-            "stop": self.stop,
-            "tp1": self.tp1,
-            "tp2": self.tp2,
-            "tp3": self.tp3,
-            "tp1_hit": self.tp1_hit,
-            "opened_at": self.opened_at,
-            "last_update": self.last_update,
-        }
+        # dict yalnız serileştirirken üretilir; karşılaştırma için signature()
+        return asdict(self)
+
+    def signature(self):
+        # dedupe / değişim tespiti: dict kurmadan hash'lenebilir tuple
+        return (self.status, self.side, self.entry, self.stop,
+                self.tp1, self.tp2, self.tp3, self.tp1_hit)
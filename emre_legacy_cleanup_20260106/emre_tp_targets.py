@@ -4,10 +4,20 @@
 #   compute_plan(mem, entry, side)
 #   compute_targets(mem, entry, side, tp1)
 
+from functools import lru_cache
+
+# regime -> expected move çarpanı (bilinmeyen regime: 0.8)
+_REGIME_MULT = {"TREND": 1.2, "HIGH_VOL": 1.4, "VOL": 1.4, "RANGE": 0.8}
+_MIN_EM_PCT = 0.0015   # %0.15
+_MAX_EM_PCT = 0.02     # %2
+
+
 def _f(x, d=0.0):
+    if type(x) is float:
+        return x
     try:
         return float(x)
-    except:
+    except (TypeError, ValueError, OverflowError):
         return d
 
 
@@ -16,21 +26,20 @@ def _expected_move(entry, mem):
     if entry <= 0:
         return 0.0
 
+    min_em = entry * _MIN_EM_PCT
+    max_em = entry * _MAX_EM_PCT
+
     r15 = _f(mem.get("range15", 0.0), 0.0)
     r60 = _f(mem.get("range60", 0.0), 0.0)
 
     base = max(r15, 0.5 * r60)
 
-    regime = str(mem.get("regime", "RANGE")).upper()
-    if regime == "TREND":
-        base *= 1.2
-    elif regime in ("HIGH_VOL", "VOL"):
-        base *= 1.4
-    else:
-        base *= 0.8
-
-    min_em = entry * 0.0015   # %0.15
-    max_em = entry * 0.02     # %2
+    # regime çoğunlukla zaten büyük harf: önce doğrudan lookup, olmazsa normalize et
+    reg = mem.get("regime", "RANGE")
+    mult = _REGIME_MULT.get(reg) if type(reg) is str else None
+    if mult is None:
+        mult = _REGIME_MULT.get(str(reg).upper(), 0.8)
+    base *= mult
 
     if base <= 0:
         base = min_em
@@ -38,37 +47,32 @@ def _expected_move(entry, mem):
     return max(min_em, min(base, max_em))
 
 
-def compute_plan(mem, entry, side):
-    side = side.upper()
+# seviye çarpanları (LONG yönünde): (stop, gh, tp2, tp3, tp4) = entry + o * sgn * em
+_OFFSETS_LONG = (-0.7, 1.0, 1.8, 3.0, 4.5)
+
+
+@lru_cache(maxsize=64)
+def _levels(entry, sgn, em):
+    # saf fonksiyon (float argümanlar): aynı tick'teki tekrar çağrılar cache'ten döner
+    # SHORT = LONG seviyelerinin entry etrafında aynası (sgn = -1); tek ifade, dal yok
+    d = sgn * em
+    return tuple(round(entry + o * d, 2) for o in _OFFSETS_LONG)
+
+
+def _plan_inputs(mem, entry, side):
+    if side != "LONG" and side != "SHORT":   # core zaten büyük harf gönderir
+        side = side.upper()
     entry = _f(entry, 0.0)
+    sgn = 1.0 if side == "LONG" else -1.0   # LONG dışı her şey SHORT (eski else dalı)
+    return entry, sgn, _expected_move(entry, mem)
+
 
-    em = _expected_move(entry, mem)
-    regime = mem.get("regime", "RANGE")
-
-    if side == "LONG":
-        stop = entry - 0.7 * em
-        gh   = entry + 1.0 * em
-        tp2  = entry + 1.8 * em
-        tp3  = entry + 3.0 * em
-        tp4  = entry + 4.5 * em
-    else:  # SHORT
-        stop = entry + 0.7 * em
-        gh   = entry - 1.0 * em
-        tp2  = entry - 1.8 * em
-        tp3  = entry - 3.0 * em
-        tp4  = entry - 4.5 * em
-
-    return (
-        round(stop, 2),
-        round(gh, 2),
-        round(tp2, 2),
-        round(tp3, 2),
-        round(tp4, 2),
-        regime,
-    )
+def compute_plan(mem, entry, side):
+    entry, sgn, em = _plan_inputs(mem, entry, side)
+    return (*_levels(entry, sgn, em), mem.get("regime", "RANGE"))
 
 
 def compute_targets(mem, entry, side, tp1):
-    # TP1 sonrası plan üretimi
-    stop, gh, tp2, tp3, tp4, regime = compute_plan(mem, entry, side)
-    return (tp2, tp3, tp4, regime)
+    # TP1 sonrası plan üretimi: stop/gh gerekmez, yalnız tp2..tp4
+    entry, sgn, em = _plan_inputs(mem, entry, side)
+    return (*_levels(entry, sgn, em)[2:], mem.get("regime", "RANGE"))